@@ -0,0 +1,143 @@
+import time
+import random
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Weight = age boost * publisher balance / (1 + reviews) ** COVERAGE_POWER
+COVERAGE_POWER = 2.0
+AGE_SCALE_HOURS = 48.0
+
+# ================== BUILD ==================
+def _age_hours(published, now):
+    if not published:
+        return np.nan
+    try:
+        pub_time = datetime.fromisoformat(str(published).replace("Z", "+00:00"))
+    except ValueError:
+        return np.nan
+    if pub_time.tzinfo is None:
+        pub_time = pub_time.replace(tzinfo=timezone.utc)
+    return max((now - pub_time).total_seconds() / 3600, 0.0)
+
+def build_sampler(articles, article_ids, review_counts=None, publishers=None, published=None):
+    """
+    Build sampler state over articles. review_counts maps article ID to its
+    current number of reviews; publishers and published are optional lists
+    aligned with articles (publisher name, ISO publication time).
+    """
+    review_counts = review_counts or {}
+    n = len(articles)
+    now = datetime.now(timezone.utc)
+
+    publishers = publishers or [""] * n
+    names, publisher_codes = np.unique([p or "" for p in publishers], return_inverse=True)
+
+    counts = np.array([review_counts.get(aid, 0) for aid in article_ids], dtype=np.float64)
+
+    ages = np.array([_age_hours(p, now) for p in (published or [None] * n)], dtype=np.float64)
+    # Fresh articles get up to double weight; undated ones get no boost
+    age_boost = 1.0 + np.nan_to_num(np.exp(-ages / AGE_SCALE_HOURS), nan=0.0)
+
+    sampler = {
+        "articles": list(articles),
+        "positions": {aid: i for i, aid in enumerate(article_ids)},
+        "counts": counts,
+        "publisher_codes": publisher_codes,
+        "publisher_articles": np.bincount(publisher_codes, minlength=len(names)).astype(np.float64),
+        "publisher_reviews": np.bincount(publisher_codes, weights=counts, minlength=len(names)),
+        "age_boost": age_boost,
+        "weights": np.zeros(n, dtype=np.float64),
+        # The apps share one sampler across session threads
+        "lock": threading.Lock()
+    }
+    _refresh_weights(sampler, slice(None))
+
+    return sampler
+
+def _refresh_weights(sampler, where):
+    codes = sampler["publisher_codes"][where]
+    coverage = sampler["publisher_reviews"] / np.maximum(sampler["publisher_articles"], 1)
+    publisher_balance = 1.0 / (1.0 + coverage[codes])
+
+    sampler["weights"][where] = (
+        sampler["age_boost"][where]
+        * publisher_balance
+        / (1.0 + sampler["counts"][where]) ** COVERAGE_POWER
+    )
+
+# ================== DRAW / UPDATE ==================
+def draw_article(sampler, exclude_ids=(), rng=None):
+    """Draw one article, never one whose ID is in exclude_ids. None if none left."""
+    rng = rng or np.random.default_rng()
+    positions = sampler["positions"]
+
+    excluded = [positions[aid] for aid in exclude_ids if aid in positions]
+    with sampler["lock"]:
+        weights = sampler["weights"].copy()
+    weights[excluded] = 0.0
+
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1] if len(cumulative) else 0.0
+    if total <= 0:
+        return None
+
+    i = int(np.searchsorted(cumulative, rng.random() * total, side="right"))
+    return sampler["articles"][min(i, len(weights) - 1)]
+
+def record_review(sampler, article_id):
+    """Account for a new review, re-weighting only that article's publisher."""
+    i = sampler["positions"].get(article_id)
+    if i is None:
+        return
+
+    code = sampler["publisher_codes"][i]
+
+    with sampler["lock"]:
+        sampler["counts"][i] += 1
+        sampler["publisher_reviews"][code] += 1
+        _refresh_weights(sampler, sampler["publisher_codes"] == code)
+
+# ================== SIMULATION ==================
+def simulate_coverage(n_articles=2000, n_reviewers=40, target=3, use_sampler=True, seed=0):
+    """
+    Reviewers take turns reviewing until every article has at least target
+    reviews. Returns (reviews needed, seconds taken).
+    """
+    rng = np.random.default_rng(seed)
+    pick = random.Random(seed)
+
+    article_ids = list(range(n_articles))
+    publishers = [f"publisher-{i % 3}" for i in article_ids]
+    sampler = build_sampler(article_ids, article_ids, publishers=publishers)
+
+    counts = np.zeros(n_articles, dtype=np.int64)
+    reviewed = [set() for _ in range(n_reviewers)]
+    steps = 0
+
+    start = time.perf_counter()
+    while counts.min() < target:
+        done = reviewed[steps % n_reviewers]
+
+        if use_sampler:
+            article_id = draw_article(sampler, done, rng)
+        else:
+            available = [a for a in article_ids if a not in done]
+            article_id = pick.choice(available) if available else None
+
+        steps += 1
+        if article_id is None:
+            continue
+
+        done.add(article_id)
+        counts[article_id] += 1
+        if use_sampler:
+            record_review(sampler, article_id)
+
+    return steps, time.perf_counter() - start
+
+if __name__ == "__main__":
+    for label, use_sampler in [("random.choice", False), ("weighted sampler", True)]:
+        steps, seconds = simulate_coverage(use_sampler=use_sampler)
+        print(f"{label}: {steps} reviews, {seconds:.2f}s to reach target coverage")
@@ -0,0 +1,58 @@
+# OFFLINE HIGHLIGHT ANALYSIS — RESOLVES STORED HIGHLIGHTS TO SENTENCES
+
+import os
+import requests
+from dotenv import load_dotenv
+
+from sentence_index import RATING_FIELDS, load_sentence_index, get_sentence, highlight_heatmap
+
+load_dotenv()
+
+AIRTABLE_TOKEN = os.getenv("AIRTABLE_TOKEN")
+BASE_ID = os.getenv("BASE_ID")
+
+HEADERS = {"Authorization": f"Bearer {AIRTABLE_TOKEN}"}
+
+ARTICLES_URL = f"https://api.airtable.com/v0/{BASE_ID}/Articles"
+REVIEWS_URL = f"https://api.airtable.com/v0/{BASE_ID}/Human Reviews"
+
+TOP_SENTENCES = 5
+
+def fetch_all_records(url):
+    records = []
+    offset = None
+
+    while True:
+        query = {"offset": offset} if offset else {}
+        res = requests.get(url, headers=HEADERS, params=query)
+        res.raise_for_status()
+
+        data = res.json()
+        records.extend(data.get("records", []))
+        offset = data.get("offset")
+
+        if not offset:
+            break
+
+    return records
+
+articles_by_id = {
+    a["fields"]["Article ID"]: a["fields"]
+    for a in fetch_all_records(ARTICLES_URL)
+    if a.get("fields", {}).get("Article ID")
+}
+reviews = fetch_all_records(REVIEWS_URL)
+
+heatmap = highlight_heatmap(reviews, articles_by_id)
+
+for article_id, sentences in heatmap.items():
+    article = articles_by_id.get(article_id, {})
+    index = load_sentence_index(article.get("Content", ""), article)
+
+    print(f"\n== {article.get('Headline', article_id)}")
+
+    ranked = sorted(sentences.items(), key=lambda item: item[1]["count"], reverse=True)
+    for sid, cell in ranked[:TOP_SENTENCES]:
+        means = " ".join(f"{name}={cell[name] / cell['count']:.1f}" for name in RATING_FIELDS)
+        print(f"  [{sid}] x{cell['count']}  {means}")
+        print(f"      {get_sentence(index, sid).strip()[:160]}")
@@ -0,0 +1,64 @@
+import os
+import time
+from functools import wraps
+
+import streamlit as st
+
+SHOW_RENDER_TIMINGS = os.getenv("SHOW_RENDER_TIMINGS", "").strip().lower() in ("1", "true", "yes")
+
+# ================== RECORDING ==================
+def record_render_time(name, seconds):
+    timings = st.session_state.setdefault("render_timings", {})
+    entry = timings.setdefault(name, {"runs": 0, "last_ms": 0.0, "total_ms": 0.0})
+
+    entry["runs"] += 1
+    entry["last_ms"] = seconds * 1000
+    entry["total_ms"] += seconds * 1000
+
+def start_run_timer():
+    """Call at the top of the script; only full reruns get this far."""
+    st.session_state.run_started = time.perf_counter()
+
+def finish_run_timer():
+    started = st.session_state.pop("run_started", None)
+    if started is not None:
+        record_render_time("full_run", time.perf_counter() - started)
+
+def timed_fragment(name, run_every=None, last=False):
+    """
+    st.fragment that also records how long each run of it takes. The last
+    fragment on the page closes the full-run timer and shows the timings,
+    so they are current after both full and fragment-only reruns.
+    """
+    def decorator(func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                record_render_time(name, time.perf_counter() - start)
+
+            if last:
+                finish_run_timer()
+                show_render_timings()
+            return result
+
+        return st.fragment(timed, run_every=run_every)
+
+    return decorator
+
+# ================== DISPLAY ==================
+def show_render_timings():
+    if not SHOW_RENDER_TIMINGS:
+        return
+
+    timings = st.session_state.get("render_timings", {})
+
+    with st.expander("Render timings"):
+        for name, entry in timings.items():
+            avg_ms = entry["total_ms"] / entry["runs"]
+            st.caption(
+                f"{name}: {entry['runs']} runs · "
+                f"last {entry['last_ms']:.1f} ms · avg {avg_ms:.1f} ms"
+            )
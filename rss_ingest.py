@@ -9,6 +9,8 @@ import time
 import os
 import urllib.parse
 
+from sentence_index import STORE_SENTENCE_FIELDS, build_sentence_fields
+
 RSS_FEEDS = {
     "News18": "https://www.news18.com/commonfeeds/v1/eng/rss/india.xml",
     "ABP India": "https://www.abplive.com/news/india/feed",
@@ -40,7 +42,9 @@ def url_exists(article_url):
     return len(response.json().get("records", [])) > 0
 
 def push_to_airtable(data):
-    requests.post(AIRTABLE_URL, headers=HEADERS, json={"fields": data})
+    res = requests.post(AIRTABLE_URL, headers=HEADERS, json={"fields": data})
+    if not res.ok:
+        print(f"Airtable rejected {data['URL']} ({res.status_code}): {res.text}")
 
 NOW = datetime.now(timezone.utc)
 WINDOW = NOW - timedelta(hours=6)
@@ -69,15 +73,20 @@ for publisher, feed_url in RSS_FEEDS.items():
         if not content:
             continue
 
+        content = content[:100000]
+
         record = {
             "Author": ", ".join(authors),
             "Publisher Name": publisher,
             "Publication Date & Time": pub_time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
             "Headline": entry.title,
-            "Content": content[:100000],
+            "Content": content,
             "URL": url,
             "Processed": False
         }
 
+        if STORE_SENTENCE_FIELDS:
+            record.update(build_sentence_fields(content))
+
         push_to_airtable(record)
         time.sleep(1)
\ No newline at end of file
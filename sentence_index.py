@@ -0,0 +1,181 @@
+import os
+import re
+import base64
+import struct
+import hashlib
+import unicodedata
+from difflib import SequenceMatcher
+
+# Sentence ends at . ! ? or the Devanagari danda, followed by whitespace
+SENTENCE_END = re.compile(r"[.!?।]+[\"'”’)]*\s+")
+FUZZY_THRESHOLD = 0.8
+# Highlights shorter than this are only matched when they are a whole sentence
+MIN_FUZZY_TOKENS = 4
+
+# Long text columns on the article tables, written by rss_ingest, and on
+# Human Reviews. They are opt-in because Airtable rejects a whole record
+# that names a missing column; highlight_backfill.py works without them.
+STORE_SENTENCE_FIELDS = os.getenv("STORE_SENTENCE_FIELDS", "").strip().lower() in ("1", "true", "yes")
+OFFSETS_FIELD = "Sentence Offsets"
+HASHES_FIELD = "Sentence Hashes"
+HIGHLIGHT_IDS_FIELD = "Highlight Sentence IDs"
+
+# ================== SEGMENTATION ==================
+def segment_sentences(text):
+    """Return (start, end) character offsets of each sentence in text."""
+    spans = []
+    start = 0
+
+    for match in SENTENCE_END.finditer(text):
+        end = match.end()
+        if text[start:end].strip():
+            spans.append((start, end))
+        start = end
+
+    if text[start:].strip():
+        spans.append((start, len(text)))
+
+    return spans
+
+def normalize_sentence(sentence):
+    sentence = "".join(
+        ch for ch in sentence.lower()
+        if not unicodedata.category(ch).startswith("P")
+    )
+    return " ".join(sentence.split())
+
+def sentence_hash(sentence):
+    digest = hashlib.blake2b(normalize_sentence(sentence).encode("utf-8"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+# ================== ENCODING ==================
+# Little-endian fixed width, so the arrays read the same on any host
+def _encode(values, fmt):
+    return base64.b64encode(struct.pack(f"<{len(values)}{fmt}", *values)).decode("ascii")
+
+def _decode(encoded, fmt):
+    raw = base64.b64decode(encoded)
+    return struct.unpack(f"<{len(raw) // struct.calcsize(fmt)}{fmt}", raw)
+
+def build_sentence_fields(content):
+    """Fields to store alongside an article at ingest time."""
+    spans = segment_sentences(content)
+    offsets = [pos for span in spans for pos in span]
+    hashes = [sentence_hash(content[s:e]) for s, e in spans]
+
+    return {
+        OFFSETS_FIELD: _encode(offsets, "I"),
+        HASHES_FIELD: _encode(hashes, "Q")
+    }
+
+def load_sentence_index(content, fields=None):
+    """
+    Build the lookup structure for one article. Uses the stored offset and
+    hash arrays when present, otherwise segments content on the spot.
+    """
+    fields = fields or {}
+
+    if fields.get(OFFSETS_FIELD) and fields.get(HASHES_FIELD):
+        offsets = _decode(fields[OFFSETS_FIELD], "I")
+        hashes = _decode(fields[HASHES_FIELD], "Q")
+    else:
+        stored = build_sentence_fields(content)
+        offsets = _decode(stored[OFFSETS_FIELD], "I")
+        hashes = _decode(stored[HASHES_FIELD], "Q")
+
+    by_hash = {}
+    for sid, h in enumerate(hashes):
+        by_hash.setdefault(h, sid)
+
+    return {"content": content, "offsets": offsets, "by_hash": by_hash}
+
+def get_sentence(index, sid):
+    offsets = index["offsets"]
+    return index["content"][offsets[2 * sid]:offsets[2 * sid + 1]]
+
+# ================== HIGHLIGHT RESOLUTION ==================
+def _fuzzy_match(index, sentence):
+    target = normalize_sentence(sentence)
+    if len(target.split()) < MIN_FUZZY_TOKENS:
+        return None
+
+    best_sid, best_score = None, (False, 0.0)
+
+    for sid in range(len(index["offsets"]) // 2):
+        candidate = normalize_sentence(get_sentence(index, sid))
+
+        # A highlight may be a fragment of a longer sentence; containing
+        # sentences beat plain fuzzy matches, the closest one winning
+        contained = target in candidate
+        matcher = SequenceMatcher(None, target, candidate)
+        floor = max(best_score[1], FUZZY_THRESHOLD)
+        if not contained and (
+            matcher.real_quick_ratio() < floor
+            or matcher.quick_ratio() < floor
+        ):
+            continue
+
+        score = (contained, matcher.ratio())
+        if contained or score[1] >= FUZZY_THRESHOLD:
+            if score > best_score:
+                best_sid, best_score = sid, score
+
+    return best_sid
+
+def resolve_highlight(index, highlight):
+    """
+    Map a pasted highlight to sentence IDs of the article. Exact sentences
+    are found by hash; anything else falls back to a fuzzy scan.
+    """
+    if not highlight or not highlight.strip():
+        return []
+
+    sentence_ids = []
+
+    for start, end in segment_sentences(highlight):
+        part = highlight[start:end]
+        sid = index["by_hash"].get(sentence_hash(part))
+        if sid is None:
+            sid = _fuzzy_match(index, part)
+        if sid is not None and sid not in sentence_ids:
+            sentence_ids.append(sid)
+
+    return sorted(sentence_ids)
+
+def parse_sentence_ids(value):
+    if not value:
+        return []
+    return [int(sid) for sid in str(value).split(",") if sid.strip()]
+
+# ================== ANALYSIS ==================
+RATING_FIELDS = ["Political", "Intensity", "Sensational", "Threat", "GroupConflict"]
+
+def highlight_heatmap(reviews, articles_by_id):
+    """
+    Per-sentence highlight counts and summed ratings, keyed by article ID
+    then sentence ID. Reviews without stored sentence IDs have their
+    Highlight resolved against the article's fields in articles_by_id.
+    """
+    heatmap = {}
+    indexes = {}
+
+    for r in reviews:
+        fields = r.get("fields", {})
+        article_id = fields.get("Article ID")
+        sentence_ids = parse_sentence_ids(fields.get(HIGHLIGHT_IDS_FIELD))
+
+        if not sentence_ids and fields.get("Highlight") and article_id in articles_by_id:
+            if article_id not in indexes:
+                article = articles_by_id[article_id]
+                indexes[article_id] = load_sentence_index(article.get("Content", ""), article)
+            sentence_ids = resolve_highlight(indexes[article_id], fields["Highlight"])
+
+        for sid in sentence_ids:
+            cell = heatmap.setdefault(article_id, {}).setdefault(
+                sid, {"count": 0, **{name: 0 for name in RATING_FIELDS}}
+            )
+            cell["count"] += 1
+            for name in RATING_FIELDS:
+                cell[name] += fields.get(name) or 0
+
+    return heatmap
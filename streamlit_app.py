@@ -2,9 +2,15 @@ import os
 import requests
 import streamlit as st
 from dotenv import load_dotenv
-import random
+from collections import Counter
 from datetime import datetime, timedelta
 
+from render_timing import timed_fragment, start_run_timer
+from sentence_index import (
+    STORE_SENTENCE_FIELDS, HIGHLIGHT_IDS_FIELD, load_sentence_index, resolve_highlight
+)
+from article_sampler import build_sampler, draw_article, record_review
+
 # ================== ENV ==================
 load_dotenv()
 
@@ -20,6 +26,8 @@ ARTICLES_URL = f"https://api.airtable.com/v0/{BASE_ID}/Articles"
 REVIEWS_URL = f"https://api.airtable.com/v0/{BASE_ID}/Human Reviews"
 REVIEWERS_URL = f"https://api.airtable.com/v0/{BASE_ID}/Reviewers"
 
+SIDEBAR_REFRESH = "60s"
+
 # ================== NORMALIZATION ==================
 def normalize_reviewer_id(rid):
     if not rid:
@@ -45,11 +53,31 @@ def fetch_all_records(url, params=None):
 
     return records
 
+# Read-only and shared, so sessions don't each unpickle every article body
+@st.cache_resource(ttl=300)
 def get_all_articles():
     return fetch_all_records(ARTICLES_URL)
 
+@st.cache_data(ttl=60)
+def get_all_reviews():
+    return fetch_all_records(REVIEWS_URL)
+
 def save_review(data):
-    requests.post(REVIEWS_URL, headers=HEADERS, json={"fields": data})
+    res = requests.post(REVIEWS_URL, headers=HEADERS, json={"fields": data})
+
+    # The sentence IDs are analysis-only; never lose a review over a missing column
+    if res.status_code == 422 and "UNKNOWN_FIELD_NAME" in res.text and HIGHLIGHT_IDS_FIELD in data:
+        data = {k: v for k, v in data.items() if k != HIGHLIGHT_IDS_FIELD}
+        res = requests.post(REVIEWS_URL, headers=HEADERS, json={"fields": data})
+
+    if not res.ok:
+        st.error(f"Could not save your review ({res.status_code}): {res.text}")
+        return False
+
+    # Only count reviews Airtable actually stored
+    record_review(get_article_sampler(), data["Article ID"])
+    clear_review_caches()
+    return True
 
 # ================== REVIEWER AUTH ==================
 @st.cache_data(ttl=300)
@@ -77,8 +105,9 @@ def calculate_streak(dates):
 
     return streak
 
+@st.cache_data(ttl=60)
 def get_reviewer_stats():
-    reviews = fetch_all_records(REVIEWS_URL)
+    reviews = get_all_reviews()
     data = {}
 
     for r in reviews:
@@ -100,8 +129,10 @@ def get_reviewer_stats():
 
     return sorted(stats, key=lambda x: x[1], reverse=True)
 
+# ================== PER-REVIEWER VIEWS ==================
+@st.cache_data(ttl=60)
 def get_historical_review_count(reviewer_id):
-    reviews = fetch_all_records(REVIEWS_URL)
+    reviews = get_all_reviews()
     norm_id = normalize_reviewer_id(reviewer_id)
 
     return sum(
@@ -109,6 +140,46 @@ def get_historical_review_count(reviewer_id):
         if normalize_reviewer_id(r.get("fields", {}).get("Reviewer ID")) == norm_id
     )
 
+@st.cache_data(ttl=60)
+def get_reviewed_article_ids(reviewer_id):
+    reviews = get_all_reviews()
+    norm_id = normalize_reviewer_id(reviewer_id)
+
+    return {
+        r["fields"].get("Article ID")
+        for r in reviews
+        if normalize_reviewer_id(r.get("fields", {}).get("Reviewer ID")) == norm_id
+    }
+
+def clear_review_caches():
+    get_all_reviews.clear()
+    get_reviewer_stats.clear()
+    get_historical_review_count.clear()
+    get_reviewed_article_ids.clear()
+
+# ================== ARTICLE SAMPLER ==================
+# Shared across sessions and updated in place on each submission
+@st.cache_resource(ttl=300)
+def get_article_sampler():
+    articles = get_all_articles()
+    review_counts = Counter(
+        r["fields"].get("Article ID")
+        for r in get_all_reviews()
+        if r.get("fields", {}).get("Article ID")
+    )
+
+    return build_sampler(
+        articles,
+        [a["fields"].get("Article ID") for a in articles],
+        review_counts,
+        publishers=[a["fields"].get("Publisher Name") for a in articles],
+        published=[a["fields"].get("Publication Date & Time") for a in articles]
+    )
+
+def choose_article(reviewer_id, skip_id=None):
+    exclude_ids = get_reviewed_article_ids(reviewer_id) | {skip_id}
+    return draw_article(get_article_sampler(), exclude_ids)
+
 # ================== SESSION ==================
 if "reviewer_id" not in st.session_state:
     st.session_state.reviewer_id = None
@@ -117,6 +188,8 @@ if "current_article" not in st.session_state:
     st.session_state.current_article = None
 
 # ================== PAGE ==================
+start_run_timer()
+
 st.set_page_config(layout="wide")
 st.title("News Article Review")
 
@@ -145,127 +218,137 @@ if current_id not in valid_reviewers:
 
 st.session_state.reviewer_id = current_id
 
-# ================== LOAD DATA ==================
-all_articles = get_all_articles()
-reviews = fetch_all_records(REVIEWS_URL)
-
-reviewed_article_ids = {
-    r["fields"].get("Article ID")
-    for r in reviews
-    if normalize_reviewer_id(r.get("fields", {}).get("Reviewer ID")) == current_id
-}
-
-available_articles = [
-    a for a in all_articles
-    if a["fields"].get("Article ID") not in reviewed_article_ids
-]
-
-total_articles = len(all_articles)
-reviewed_count = get_historical_review_count(current_id)
-remaining_count = total_articles - reviewed_count
-
 # ================== SIDEBAR ==================
-st.sidebar.markdown("### Your Progress")
-st.sidebar.metric("Articles reviewed", reviewed_count)
-st.sidebar.metric("Articles remaining", remaining_count)
+@timed_fragment("sidebar", run_every=SIDEBAR_REFRESH)
+def progress_sidebar(current_id):
+    total_articles = len(get_all_articles())
+    reviewed_count = get_historical_review_count(current_id)
+    remaining_count = total_articles - reviewed_count
+
+    st.markdown("### Your Progress")
+    st.metric("Articles reviewed", reviewed_count)
+    st.metric("Articles remaining", remaining_count)
+
+    progress = reviewed_count / total_articles if total_articles else 0
+    st.progress(progress, text=f"{reviewed_count} / {total_articles}")
+
+    st.markdown("### Top Reviewers")
+    for rank, (rid, count, streak) in enumerate(get_reviewer_stats()[:10], start=1):
+        tag = " (you)" if rid == current_id else ""
+        st.markdown(f"{rank}. {rid}{tag}  \n{count} reviews · {streak}-day streak")
+
+# ================== REVIEW PANE ==================
+@timed_fragment("review_pane", last=True)
+def review_pane(current_id):
+    fields = st.session_state.current_article["fields"]
+    article_id = fields.get("Article ID")
+    key_suffix = f"_{article_id}"
+
+    col1, col2 = st.columns([2.2, 1])
+
+    with col1:
+        st.subheader(fields.get("Headline", "No headline"))
+        st.write(fields.get("Content", "No content available"))
+
+    with col2:
+        st.subheader("Your Assessment")
+
+        with st.form(f"review_form_{article_id}"):
+
+            st.markdown("**Political framing**")
+            st.caption("1 = Left-leaning | 3 = Neutral | 5 = Right-leaning")
+            political = st.slider(
+                " ",
+                1, 5,
+                key=f"political{key_suffix}"
+            )
+
+            st.markdown("**Language intensity**")
+            st.caption("1 = Calm, factual | 5 = Highly emotional or charged")
+            intensity = st.slider(
+                "  ",
+                1, 5,
+                key=f"intensity{key_suffix}"
+            )
+
+            st.markdown("**Sensationalism**")
+            st.caption("1 = Straight reporting | 5 = Dramatic or exaggerated")
+            sensational = st.slider(
+                "   ",
+                1, 5,
+                key=f"sensational{key_suffix}"
+            )
+
+            st.markdown("**Perceived threat level**")
+            st.caption("1 = No alarm | 5 = Urgent or alarming")
+            threat = st.slider(
+                "    ",
+                1, 5,
+                key=f"threat{key_suffix}"
+            )
+
+            st.markdown("**Us vs them tone**")
+            st.caption("1 = No division | 5 = Strong in-group vs out-group framing")
+            group = st.slider(
+                "     ",
+                1, 5,
+                key=f"group{key_suffix}"
+            )
+
+            st.markdown("---")
+
+            emotions = st.text_input("Emotions felt (optional)", key=f"emotions{key_suffix}")
+            highlight = st.text_area(
+                "Sentence that shaped your impression",
+                key=f"highlight{key_suffix}"
+            )
+
+            submit = st.form_submit_button("Submit review")
+
+        if submit:
+            review = {
+                "Reviewer ID": current_id,
+                "Article ID": article_id,
+                "Political": political,
+                "Intensity": intensity,
+                "Sensational": sensational,
+                "Threat": threat,
+                "GroupConflict": group,
+                "Emotions": emotions,
+                "Highlight": highlight
+            }
+
+            if STORE_SENTENCE_FIELDS:
+                sentence_index = load_sentence_index(fields.get("Content", ""), fields)
+                highlight_ids = resolve_highlight(sentence_index, highlight)
+                review[HIGHLIGHT_IDS_FIELD] = ",".join(str(sid) for sid in highlight_ids)
+
+            saved = save_review(review)
+
+            if saved:
+                st.success("Review submitted.")
+                st.session_state.current_article = None
+                st.rerun()
+
+        if st.button("Skip article"):
+            next_article = choose_article(current_id, article_id)
+            if next_article:
+                st.session_state.current_article = next_article
+                st.rerun(scope="fragment")
+            st.info("No other articles available to skip to.")
+
+# ================== RENDER ===================
+with st.sidebar:
+    progress_sidebar(current_id)
 
-progress = reviewed_count / total_articles if total_articles else 0
-st.sidebar.progress(progress, text=f"{reviewed_count} / {total_articles}")
-
-st.sidebar.markdown("### Top Reviewers")
-for rank, (rid, count, streak) in enumerate(get_reviewer_stats()[:10], start=1):
-    tag = " (you)" if rid == current_id else ""
-    st.sidebar.markdown(f"{rank}. {rid}{tag}  \n{count} reviews · {streak}-day streak")
+# ================== LOAD ARTICLE ==================
+if st.session_state.current_article is None:
+    st.session_state.current_article = choose_article(current_id)
 
 # ================== NO ARTICLES LEFT ==================
-if not available_articles:
+if st.session_state.current_article is None:
     st.success("You have reviewed all available articles. Thank you.")
     st.stop()
 
-# ================== LOAD ARTICLE ==================
-if st.session_state.current_article is None:
-    st.session_state.current_article = random.choice(available_articles)
-
-fields = st.session_state.current_article["fields"]
-article_id = fields.get("Article ID")
-key_suffix = f"_{article_id}"
-
 # ================== LAYOUT ==================
-col1, col2 = st.columns([2.2, 1])
-
-with col1:
-    st.subheader(fields.get("Headline", "No headline"))
-    st.write(fields.get("Content", "No content available"))
-
-with col2:
-    st.subheader("Your Assessment")
-
-    with st.form(f"review_form_{article_id}"):
-
-        st.markdown("**Political framing**")
-        st.caption("1 = Left-leaning | 3 = Neutral | 5 = Right-leaning")
-        political = st.slider(
-            " ",
-            1, 5,
-            key=f"political{key_suffix}"
-        )
-
-        st.markdown("**Language intensity**")
-        st.caption("1 = Calm, factual | 5 = Highly emotional or charged")
-        intensity = st.slider(
-            "  ",
-            1, 5,
-            key=f"intensity{key_suffix}"
-        )
-
-        st.markdown("**Sensationalism**")
-        st.caption("1 = Straight reporting | 5 = Dramatic or exaggerated")
-        sensational = st.slider(
-            "   ",
-            1, 5,
-            key=f"sensational{key_suffix}"
-        )
-
-        st.markdown("**Perceived threat level**")
-        st.caption("1 = No alarm | 5 = Urgent or alarming")
-        threat = st.slider(
-            "    ",
-            1, 5,
-            key=f"threat{key_suffix}"
-        )
-
-        st.markdown("**Us vs them tone**")
-        st.caption("1 = No division | 5 = Strong in-group vs out-group framing")
-        group = st.slider(
-            "     ",
-            1, 5,
-            key=f"group{key_suffix}"
-        )
-
-        st.markdown("---")
-
-        emotions = st.text_input("Emotions felt (optional)")
-        highlight = st.text_area("Sentence that shaped your impression")
-
-        submit = st.form_submit_button("Submit review")
-
-    if submit:
-        save_review({
-            "Reviewer ID": current_id,
-            "Article ID": article_id,
-            "Political": political,
-            "Intensity": intensity,
-            "Sensational": sensational,
-            "Threat": threat,
-            "GroupConflict": group,
-            "Emotions": emotions,
-            "Highlight": highlight
-        })
-
-        st.success("Review submitted.")
-        st.session_state.current_article = None
-        st.rerun()
-
-    if st.button("Skip article"):
-        st.session_state.current_article = random.choice(available_articles)
-        st.rerun()
+review_pane(current_id)
@@ -1,9 +1,12 @@
 import os
-import random
+from collections import Counter
 import streamlit as st
 from dotenv import load_dotenv
 from supabase import create_client
 
+from render_timing import timed_fragment, start_run_timer
+from article_sampler import build_sampler, draw_article, record_review
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -11,6 +14,8 @@ SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+SIDEBAR_REFRESH = "60s"
+
 # ---------- SESSION STATE ----------
 if "reviewer_id" not in st.session_state:
     st.session_state.reviewer_id = None  # UUID
@@ -22,6 +27,8 @@ if "current_article" not in st.session_state:
     st.session_state.current_article = None
 
 # ---------- PAGE SETUP ----------
+start_run_timer()
+
 st.set_page_config(layout="wide")
 st.title("🧠 News Article Review")
 
@@ -66,6 +73,8 @@ else:
 
 # ---------- DATA LOADING FUNCTIONS ----------
 
+# Read-only and shared, so sessions don't each unpickle every article body
+@st.cache_resource(ttl=300)
 def get_active_articles():
     data = supabase.table("review_articles") \
         .select("article_id, articles(id, headline, content)") \
@@ -75,6 +84,7 @@ def get_active_articles():
     return [row["articles"] for row in data if row.get("articles")]
 
 
+@st.cache_data(ttl=60)
 def get_reviews_by_user(reviewer_id):
     return supabase.table("human_reviews") \
         .select("article_id") \
@@ -82,27 +92,156 @@ def get_reviews_by_user(reviewer_id):
         .execute().data
 
 
+@st.cache_data(ttl=60)
+def get_reviewed_ids(reviewer_id):
+    return {r["article_id"] for r in get_reviews_by_user(reviewer_id)}
+
+
+def get_review_counts(page_size=1000):
+    # PostgREST caps responses at 1000 rows, so page through all reviews
+    counts = Counter()
+    start = 0
+
+    while True:
+        data = supabase.table("human_reviews") \
+            .select("article_id") \
+            .order("id") \
+            .range(start, start + page_size - 1) \
+            .execute().data
+
+        counts.update(r["article_id"] for r in data)
+        if len(data) < page_size:
+            break
+        start += page_size
+
+    return counts
+
+
 def save_review(data):
+    # execute() raises on a rejected insert, so the sampler only
+    # counts reviews that were actually stored
     supabase.table("human_reviews").insert(data).execute()
+    record_review(get_article_sampler(), data["article_id"])
+    get_reviews_by_user.clear()
+    get_reviewed_ids.clear()
 
-# ---------- LOAD DATA ----------
-all_articles = get_active_articles()
-user_reviews = get_reviews_by_user(st.session_state.reviewer_id)
+# ---------- ARTICLE SAMPLER ----------
+# Shared across sessions and updated in place on each submission
+@st.cache_resource(ttl=300)
+def get_article_sampler():
+    articles = get_active_articles()
+    return build_sampler(articles, [a["id"] for a in articles], get_review_counts())
 
-reviewed_ids = {r["article_id"] for r in user_reviews}
-available_articles = [a for a in all_articles if a["id"] not in reviewed_ids]
 
-total_articles = len(all_articles)
-reviewed_count = len(user_reviews)
-remaining_count = len(available_articles)
+def choose_article(reviewer_id, skip_id=None):
+    exclude_ids = get_reviewed_ids(reviewer_id) | {skip_id}
+    return draw_article(get_article_sampler(), exclude_ids)
 
 # ---------- SIDEBAR ----------
-st.sidebar.metric("Total articles in system", total_articles)
-st.sidebar.metric("You have reviewed", reviewed_count)
-st.sidebar.metric("Articles left for you", remaining_count)
+@timed_fragment("sidebar", run_every=SIDEBAR_REFRESH)
+def progress_sidebar(reviewer_id):
+    active_ids = {a["id"] for a in get_active_articles()}
+    total_articles = len(active_ids)
+    reviewed_count = len(get_reviews_by_user(reviewer_id))
+    remaining_count = len(active_ids - get_reviewed_ids(reviewer_id))
+
+    st.metric("Total articles in system", total_articles)
+    st.metric("You have reviewed", reviewed_count)
+    st.metric("Articles left for you", remaining_count)
+
+    progress = reviewed_count / total_articles if total_articles else 0
+    st.progress(progress, text=f"Progress: {reviewed_count}/{total_articles}")
+
+# ---------- REVIEW PANE ----------
+@timed_fragment("review_pane", last=True)
+def review_pane(reviewer_id):
+    article = st.session_state.current_article
+    article_id = article["id"]
+    key_suffix = f"_{article_id}"
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.header(article.get("headline", "No headline"))
+        st.write(article.get("content", "No content available"))
+
+    with col2:
+        st.subheader("Your Review")
+
+        st.markdown("### 💭 Emotional Reaction Guide")
+        st.markdown("""
+        - Fear or anxiety  
+        - Anger or outrage  
+        - Pride or nationalism  
+        - Sympathy or empathy  
+        - Distrust or suspicion  
+        - Hope or reassurance  
+        """)
+
+        with st.form(f"review_form_{article_id}"):
+
+            st.markdown("### 🏛 Political Framing")
+            political = st.slider("Left ← → Right", 1, 5, key=f"political{key_suffix}")
+
+            st.markdown("### 🌡 Language Intensity")
+            intensity = st.slider("Calm ← → Emotional", 1, 5, key=f"intensity{key_suffix}")
+
+            st.markdown("### 🎬 Sensationalism")
+            sensational = st.slider("Measured ← → Dramatic", 1, 5, key=f"sensational{key_suffix}")
+
+            st.markdown("### 🚨 Threat Level")
+            threat = st.slider("Low ← → High", 1, 5, key=f"threat{key_suffix}")
+
+            st.markdown("### 👥 Us vs Them Tone")
+            group = st.slider("None ← → Strong", 1, 5, key=f"group{key_suffix}")
+
+            emotions = st.text_input("Emotions you felt", key=f"emotions{key_suffix}")
+
+            highlight = st.text_area(
+                "Sentence that shaped your impression",
+                key=f"highlight{key_suffix}"
+            )
+
+            submit = st.form_submit_button("Submit Review")
+
+        if submit:
+            save_review({
+                "reviewer_id": reviewer_id,  # UUID
+                "article_id": article_id,
+                "political": political,
+                "intensity": intensity,
+                "sensational": sensational,
+                "threat": threat,
+                "group_conflict": group,
+                "emotions": emotions,
+                "highlight": highlight
+            })
+
+            st.success("🌟 Thank you for lending your brainpower! The algorithm just got smarter thanks to you 🤖💛")
+
+            # Clear widget state so next article is fresh
+            clear_review_widgets()
+
+            st.session_state.current_article = None
+            st.rerun()
+
+        if st.button("Skip Article"):
+            next_article = choose_article(reviewer_id, article_id)
+            if next_article:
+                st.session_state.current_article = next_article
+                clear_review_widgets()
+                st.rerun(scope="fragment")
+            st.info("No other articles available to skip to.")
+
+
+def clear_review_widgets():
+    for key in list(st.session_state.keys()):
+        if key.startswith(("political_", "intensity_", "sensational_", "threat_", "group_", "emotions_", "highlight_")):
+            del st.session_state[key]
 
-progress = reviewed_count / total_articles if total_articles else 0
-st.sidebar.progress(progress, text=f"Progress: {reviewed_count}/{total_articles}")
+# ---------- SIDEBAR ----------
+with st.sidebar:
+    progress_sidebar(st.session_state.reviewer_id)
 
 st.sidebar.markdown("### 🧭 Rating Guide")
 st.sidebar.markdown("""
@@ -127,91 +266,17 @@ st.sidebar.markdown("""
 5 = Strong division
 """)
 
-# ---------- FINISHED ----------
-if not available_articles:
-    st.success("🎉 You’ve reviewed all available articles. You are officially a news-sensei. Thank you!")
-    st.stop()
-
 # ---------- LOAD ARTICLE SAFELY ----------
 if (
     st.session_state.current_article is None
-    or st.session_state.current_article["id"] in reviewed_ids
+    or st.session_state.current_article["id"] in get_reviewed_ids(st.session_state.reviewer_id)
 ):
-    st.session_state.current_article = random.choice(available_articles)
+    st.session_state.current_article = choose_article(st.session_state.reviewer_id)
 
-article = st.session_state.current_article
-article_id = article["id"]
-key_suffix = f"_{article_id}"
+# ---------- FINISHED ----------
+if st.session_state.current_article is None:
+    st.success("🎉 You’ve reviewed all available articles. You are officially a news-sensei. Thank you!")
+    st.stop()
 
 # ---------- LAYOUT ----------
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.header(article.get("headline", "No headline"))
-    st.write(article.get("content", "No content available"))
-
-with col2:
-    st.subheader("Your Review")
-
-    st.markdown("### 💭 Emotional Reaction Guide")
-    st.markdown("""
-    - Fear or anxiety  
-    - Anger or outrage  
-    - Pride or nationalism  
-    - Sympathy or empathy  
-    - Distrust or suspicion  
-    - Hope or reassurance  
-    """)
-
-    with st.form(f"review_form_{article_id}"):
-
-        st.markdown("### 🏛 Political Framing")
-        political = st.slider("Left ← → Right", 1, 5, key=f"political{key_suffix}")
-
-        st.markdown("### 🌡 Language Intensity")
-        intensity = st.slider("Calm ← → Emotional", 1, 5, key=f"intensity{key_suffix}")
-
-        st.markdown("### 🎬 Sensationalism")
-        sensational = st.slider("Measured ← → Dramatic", 1, 5, key=f"sensational{key_suffix}")
-
-        st.markdown("### 🚨 Threat Level")
-        threat = st.slider("Low ← → High", 1, 5, key=f"threat{key_suffix}")
-
-        st.markdown("### 👥 Us vs Them Tone")
-        group = st.slider("None ← → Strong", 1, 5, key=f"group{key_suffix}")
-
-        emotions = st.text_input("Emotions you felt", key=f"emotions{key_suffix}")
-
-        highlight = st.text_area(
-            "Sentence that shaped your impression",
-            key=f"highlight{key_suffix}"
-        )
-
-        submit = st.form_submit_button("Submit Review")
-
-    if submit:
-        save_review({
-            "reviewer_id": st.session_state.reviewer_id,  # UUID
-            "article_id": article_id,
-            "political": political,
-            "intensity": intensity,
-            "sensational": sensational,
-            "threat": threat,
-            "group_conflict": group,
-            "emotions": emotions,
-            "highlight": highlight
-        })
-
-        st.success("🌟 Thank you for lending your brainpower! The algorithm just got smarter thanks to you 🤖💛")
-
-        # Clear widget state so next article is fresh
-        for key in list(st.session_state.keys()):
-            if key.startswith(("political_", "intensity_", "sensational_", "threat_", "group_", "emotions_", "highlight_")):
-                del st.session_state[key]
-
-        st.session_state.current_article = None
-        st.rerun()
-
-    if st.button("Skip Article"):
-        st.session_state.current_article = random.choice(available_articles)
-        st.rerun()
+review_pane(st.session_state.reviewer_id)